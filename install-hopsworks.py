@@ -19,15 +19,25 @@ import os
 import uuid
 import shutil
 import argparse
+import shlex
+import re
+import getpass
 from datetime import datetime
 import urllib.request
 import urllib.error
 import ssl
 import threading
+import collections
 import boto3
 import json
+import base64
 import tempfile
 import yaml
+try:
+    # libyaml bindings, when PyYAML was built with them
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 
 HOPSWORKS_LOGO = """
 ██╗  ██╗    ██████╗    ██████╗    ███████╗   ██╗    ██╗    ██████╗    ██████╗    ██╗  ██╗   ███████╗
@@ -41,11 +51,18 @@ HOPSWORKS_LOGO = """
 SERVER_URL = "https://magiclex--hopsworks-installation-hopsworks-installation.modal.run/"
 STARTUP_LICENSE_URL = "https://www.hopsworks.ai/startup-license"
 EVALUATION_LICENSE_URL = "https://www.hopsworks.ai/evaluation-license"
+# Lines of stderr kept from streamed commands; everything is still echoed to the terminal
+STREAM_STDERR_LINES = 2000
 KNOWN_NONFATAL_ERRORS = [
     "invalid ingress class: IngressClass.networking.k8s.io",
 ]
+# Matches any of the messages above in one pass over helm's stderr
+KNOWN_NONFATAL_ERRORS_RE = re.compile("|".join(map(re.escape, KNOWN_NONFATAL_ERRORS)))
 
 """ All the helm stuff here ⬇ """
+# Charts are installed with --repo, so the user's helm repo list is never touched
+HOPSWORKS_HELM_REPO = "https://nexus.hops.works/repository/hopsworks-helm"
+EKS_HELM_REPO = "https://aws.github.io/eks-charts"
 HELM_BASE_CONFIG = {
     "hopsworks.service.worker.external.https.type": "LoadBalancer",
     "global._hopsworks.externalLoadBalancers.enabled": "true",
@@ -101,36 +118,117 @@ CLOUD_SPECIFIC_VALUES = {
     }
 }
 
+COLORS = {
+    "red": "\033[91m", "green": "\033[92m", "yellow": "\033[93m",
+    "blue": "\033[94m", "magenta": "\033[95m", "cyan": "\033[96m",
+    "white": "\033[97m", "reset": "\033[0m"
+}
+
 # Utilities 
 
 def print_colored(message, color, **kwargs):
-    colors = {
-        "red": "\033[91m", "green": "\033[92m", "yellow": "\033[93m",
-        "blue": "\033[94m", "magenta": "\033[95m", "cyan": "\033[96m",
-        "white": "\033[97m", "reset": "\033[0m"
-    }
-    print(f"{colors.get(color, '')}{message}{colors['reset']}", **kwargs)
+    print(f"{COLORS.get(color, '')}{message}{COLORS['reset']}", **kwargs)
+
+def run_command(command, verbose=True, input=None, stream=False, capture_stderr=True):
+    """Runs command (an argv list) without a shell, optionally feeding input to its stdin.
+
+    Polls that ignore stderr pass capture_stderr=False to send it to /dev/null instead
+    of piping it back; the returned stderr is then empty.
 
-def run_command(command, verbose=True):
+    With stream=True the command writes its stdout straight to the terminal so long
+    running commands show their progress live; stderr is echoed line by line as it
+    arrives and captured for the caller.
+    """
     if verbose:
-        print_colored(f"Running: {command}", "cyan")
+        print_colored(f"Running: {shlex.join(command)}", "cyan")
     try:
+        if stream:
+            return stream_command(command, verbose, input)
         result = subprocess.run(
-            command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            command, input=input, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL, text=True
         )
         if verbose:
             if result.stdout:
                 print(result.stdout)
             if result.stderr:
                 print_colored(result.stderr, "yellow")
-        return result.returncode == 0, result.stdout, result.stderr
+        return result.returncode == 0, result.stdout or "", result.stderr or ""
     except Exception as e:
         return False, "", str(e)
 
+def stream_command(command, verbose, input):
+    """Runs command with stdout on the terminal, echoing stderr as it is written and keeping its tail"""
+    # The child writes to our stdout directly, so anything still buffered must go out first
+    sys.stdout.flush()
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE if input is not None else None, stdout=None,
+        stderr=subprocess.PIPE, text=True, bufsize=1
+    )
+    if input is not None:
+        process.stdin.write(input)
+        process.stdin.close()
+    stderr_lines = collections.deque(maxlen=STREAM_STDERR_LINES)
+    for line in process.stderr:
+        stderr_lines.append(line)
+        if verbose:
+            print_colored(line.rstrip('\n'), "yellow", flush=True)
+    process.wait()
+    return process.returncode == 0, "", "".join(stderr_lines)
+
+def write_file(path, content):
+    """Writes content next to path first and renames it into place, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def apply_manifest(manifest, verbose=True):
+    """Applies a manifest built as a dict with a single server-side `kubectl apply`"""
+    document = yaml.dump(manifest, Dumper=SafeDumper, sort_keys=False)
+    command = ["kubectl", "apply", "--server-side", "--force-conflicts", "--field-manager=hopsworks-installer", "-f", "-"]
+    return run_command(command, verbose=verbose, input=document)
+
+def ensure_namespace(namespace):
+    """Creates namespace, or leaves it as is when it already exists"""
+    return apply_manifest({"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": namespace}})
+
+def helm_typed_value(value):
+    """Types a string value the way `helm --set` does: booleans, null and integers"""
+    if not isinstance(value, str):
+        return value
+    if value in ("true", "false"):
+        return value == "true"
+    if value == "null":
+        return None
+    if re.fullmatch(r"0|-?[1-9][0-9]*", value):
+        return int(value)
+    return value
+
+def set_helm_value(values, key, value):
+    """Sets a `helm --set` style key in a nested values dict.
+
+    Dots separate levels unless escaped as `\\.`, and a trailing `[n]` indexes a list.
+    """
+    *parents, leaf = [part.replace("\\.", ".") for part in re.split(r"(?<!\\)\.", key)]
+    node = values
+    for part in parents:
+        node = node.setdefault(part, {})
+    value = helm_typed_value(value)
+    match = re.fullmatch(r"(.+)\[(\d+)\]", leaf)
+    if match:
+        items = node.setdefault(match.group(1), [])
+        index = int(match.group(2))
+        items.extend([None] * (index + 1 - len(items)))
+        items[index] = value
+    else:
+        node[leaf] = value
+
 def get_user_input(prompt, options=None):
+    accepted = frozenset(option.lower() for option in options) if options is not None else None
     while True:
         response = input(prompt + " ").strip()
-        if options is None or response.lower() in [option.lower() for option in options]:
+        if accepted is None or response.lower() in accepted:
             return response
         print_colored(f"Invalid input. Expected one of: {', '.join(options)}", "yellow")
 
@@ -146,6 +244,7 @@ class HopsworksInstaller:
             self.namespace = 'hopsworks'
             self.installation_id = None
             self.args = None
+            self.config = {}
             
             # GCP specific
             self.project_id = None
@@ -167,10 +266,14 @@ class HopsworksInstaller:
     def run(self):
         print_colored(HOPSWORKS_LOGO, "white")
         self.parse_arguments()
-        self.check_required_tools()
         self.get_deployment_environment()
+        # Needs the environment to know which cloud CLI to look for
+        self.check_required_tools()
 
         if not self.args.loadbalancer_only:
+            # Ask for the license and user details before any cloud resources are created, so the
+            # long cluster setup runs unattended and declining the license costs nothing
+            self.handle_license_and_user_data()
             if self.environment == "GCP":
                 self.setup_gke_prerequisites()
             elif self.environment == "AWS":
@@ -181,7 +284,6 @@ class HopsworksInstaller:
                 self.setup_and_verify_kubeconfig()  # Only for other environments
                 
             self.handle_managed_registry()
-            self.handle_license_and_user_data()
             if self.install_hopsworks():
                 print_colored("\nHopsworks installation completed.", "green")
                 self.finalize_installation()
@@ -193,28 +295,20 @@ class HopsworksInstaller:
             self.namespace = self.args.namespace
             self.setup_and_verify_kubeconfig()
             self.finalize_installation()
-                
-    def construct_helm_command(self):
-            """Constructs the helm command with proper configuration"""
-            # Base helm command
-            helm_command = [
-                "helm upgrade --install hopsworks-release hopsworks/hopsworks",
-                f"--namespace={self.namespace}",
-                "--create-namespace",
-                "--values hopsworks/values.yaml"
-            ]
-            
-            # Helper function to flatten nested dictionaries
-            def flatten_dict(d, parent_key='', sep='.'):
-                items = []
-                for k, v in d.items():
-                    new_key = f"{parent_key}{sep}{k}" if parent_key else k
-                    if isinstance(v, dict):
-                        items.extend(flatten_dict(v, new_key, sep=sep).items())
-                    else:
-                        items.append((new_key, v))
-                return dict(items)
 
+    def ask(self, key, prompt, default="", secret=False):
+        """Returns the answer for key from the --config file, prompting only when it is not set there.
+
+        Secret answers are read without echoing them to the terminal.
+        """
+        value = self.config.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+        answer = getpass.getpass(prompt) if secret else input(prompt)
+        return answer.strip() or default
+                
+    def construct_helm_values(self):
+            """Builds the chart values for the selected environment as a nested dict"""
             # Start with base config
             helm_values = HELM_BASE_CONFIG.copy()
             
@@ -244,50 +338,44 @@ class HopsworksInstaller:
                 
                 helm_values.update(cloud_config)
 
-            # Flatten nested structures
-            flat_values = flatten_dict(helm_values)
-            
-            # Add each value with proper escaping and formatting
-            for key, value in flat_values.items():
-                if value is None:
-                    value = "null"
-                elif isinstance(value, bool):
-                    value = str(value).lower()
-                elif isinstance(value, (int, float)):
-                    value = str(value)
-                else:
-                    # Escape special characters in string values
-                    value = f'"{str(value)}"'
-                
-                helm_command.append(f"--set {key}={value}")
-
-            # Add timeout and devel flag
-            helm_command.extend([
-                "--timeout 60m",
+            # Expand the --set style keys into the nested structure of a values file
+            values = {}
+            for key, value in helm_values.items():
+                set_helm_value(values, key, value)
+            return values
+
+    def construct_helm_command(self, values_file):
+            """Constructs the helm command, reading the chart values from values_file"""
+            return [
+                "helm", "upgrade", "--install", "hopsworks-release", "hopsworks",
+                "--repo", HOPSWORKS_HELM_REPO,
+                f"--namespace={self.namespace}",
+                "--create-namespace",
+                "--values", values_file,
+                "--timeout", "60m",
                 "--devel"
-            ])
+            ]
 
-            return " ".join(helm_command)
     def setup_aws_prerequisites(self):
         """Setup AWS prerequisites including metrics server"""
         print_colored("\nSetting up AWS prerequisites...", "blue")
         
         # 1. Basic AWS setup and verification
-        self.aws_profile = input("Enter your AWS profile name (default: default): ").strip() or "default"
+        self.aws_profile = self.ask('aws_profile', "Enter your AWS profile name (default: default): ", "default")
         os.environ['AWS_PROFILE'] = self.aws_profile
         
         # Verify AWS credentials
-        cmd = f"aws sts get-caller-identity --profile {self.aws_profile}"
+        cmd = ["aws", "sts", "get-caller-identity", "--profile", self.aws_profile]
         if not run_command(cmd, verbose=False)[0]:
             print_colored("AWS CLI not properly configured. Please run 'aws configure' first.", "red")
             sys.exit(1)
         
         # Get basic info
         self.region = self.get_aws_region()
-        self.cluster_name = input("Enter your EKS cluster name: ").strip()
+        self.cluster_name = self.ask('cluster_name', "Enter your EKS cluster name: ")
         
         # Get AWS account ID
-        cmd = f"aws sts get-caller-identity --query Account --output text --profile {self.aws_profile}"
+        cmd = ["aws", "sts", "get-caller-identity", "--query", "Account", "--output", "text", "--profile", self.aws_profile]
         success, account_id, _ = run_command(cmd)
         if not success:
             print_colored("Failed to get AWS account ID.", "red")
@@ -295,14 +383,15 @@ class HopsworksInstaller:
         self.aws_account_id = account_id.strip()
 
         # 2. Create S3 bucket
-        bucket_name = input("Enter S3 bucket name for Hopsworks data: ").strip()
-        cmd = f"aws s3 mb s3://{bucket_name} --region {self.region} --profile {self.aws_profile}"
+        bucket_name = self.ask('bucket_name', "Enter S3 bucket name for Hopsworks data: ")
+        cmd = ["aws", "s3", "mb", f"s3://{bucket_name}", "--region", self.region, "--profile", self.aws_profile]
         if not run_command(cmd)[0]:
             print_colored("Failed to create S3 bucket", "red")
             sys.exit(1)
         
         # Enable versioning on the bucket
-        cmd = f"aws s3api put-bucket-versioning --bucket {bucket_name} --versioning-configuration Status=Enabled --profile {self.aws_profile}"
+        cmd = ["aws", "s3api", "put-bucket-versioning", "--bucket", bucket_name,
+               "--versioning-configuration", "Status=Enabled", "--profile", self.aws_profile]
         if not run_command(cmd)[0]:
             print_colored("Failed to enable bucket versioning", "red")
             sys.exit(1)
@@ -310,7 +399,8 @@ class HopsworksInstaller:
         # 3. Create ECR repository
         print_colored("\nCreating ECR repository...", "cyan")
         repo_name = f"{self.cluster_name}/hopsworks-base"
-        cmd = f"aws ecr create-repository --repository-name {repo_name} --profile {self.aws_profile} --region {self.region}"
+        cmd = ["aws", "ecr", "create-repository", "--repository-name", repo_name,
+               "--profile", self.aws_profile, "--region", self.region]
         if not run_command(cmd)[0]:
             print_colored("Failed to create ECR repository", "red")
             sys.exit(1)
@@ -377,11 +467,11 @@ class HopsworksInstaller:
         }
         
         timestamp = int(time.time())
-        with open(f'policy-{timestamp}.json', 'w') as f:
-            json.dump(policy, f, indent=2)
+        write_file(f'policy-{timestamp}.json', json.dumps(policy, indent=2))
 
         self.policy_name = f"hopsworks-policy-{timestamp}"
-        cmd = f"aws iam create-policy --policy-name {self.policy_name} --policy-document file://policy-{timestamp}.json --profile {self.aws_profile}"
+        cmd = ["aws", "iam", "create-policy", "--policy-name", self.policy_name,
+               "--policy-document", f"file://policy-{timestamp}.json", "--profile", self.aws_profile]
         if not run_command(cmd)[0]:
             print_colored("Failed to create IAM policy", "red")
             sys.exit(1)
@@ -391,8 +481,8 @@ class HopsworksInstaller:
 
         # 5. Create EKS cluster configuration
         print_colored("\nCreating EKS cluster configuration...", "cyan")
-        instance_type = input("Enter instance type (default: m6i.2xlarge): ").strip() or "m6i.2xlarge"
-        node_count = input("Enter number of nodes (default: 4): ").strip() or "4"
+        instance_type = self.ask('instance_type', "Enter instance type (default: m6i.2xlarge): ", "m6i.2xlarge")
+        node_count = self.ask('node_count', "Enter number of nodes (default: 4): ", "4")
 
         cluster_config = {
             "apiVersion": "eksctl.io/v1alpha5",
@@ -435,13 +525,12 @@ class HopsworksInstaller:
             }]
         }
 
-        with open(f'eksctl-{timestamp}.yaml', 'w') as f:
-            yaml.dump(cluster_config, f)
+        write_file(f'eksctl-{timestamp}.yaml', yaml.dump(cluster_config, Dumper=SafeDumper, sort_keys=False))
 
         # 6. Create EKS cluster
         print_colored("\nCreating EKS cluster (this will take 15-20 minutes)...", "cyan")
-        cmd = f"eksctl create cluster -f eksctl-{timestamp}.yaml --profile {self.aws_profile}"
-        if not run_command(cmd)[0]:
+        cmd = ["eksctl", "create", "cluster", "-f", f"eksctl-{timestamp}.yaml", "--profile", self.aws_profile]
+        if not run_command(cmd, stream=True)[0]:
             print_colored("Failed to create EKS cluster", "red")
             sys.exit(1)
 
@@ -462,10 +551,7 @@ class HopsworksInstaller:
             "reclaimPolicy": "Delete"
         }
         
-        with open(f'storage-class-{timestamp}.yaml', 'w') as f:
-            yaml.dump(storage_class, f)
-        
-        if not run_command(f"kubectl apply -f storage-class-{timestamp}.yaml")[0]:
+        if not apply_manifest(storage_class)[0]:
             print_colored("Failed to create GP3 storage class", "red")
             sys.exit(1)
 
@@ -473,26 +559,28 @@ class HopsworksInstaller:
         print_colored("\nSetting up AWS Load Balancer Controller...", "cyan")
         
         # Download and create ALB policy
-        cmd = "curl -o iam_policy_alb.json https://raw.githubusercontent.com/kubernetes-sigs/aws-load-balancer-controller/v2.7.2/docs/install/iam_policy.json"
+        cmd = ["curl", "-o", "iam_policy_alb.json",
+               "https://raw.githubusercontent.com/kubernetes-sigs/aws-load-balancer-controller/v2.7.2/docs/install/iam_policy.json"]
         if not run_command(cmd)[0]:
             print_colored("Failed to download ALB policy", "red")
             sys.exit(1)
 
         alb_policy_name = f"AWSLoadBalancerControllerIAMPolicy-{self.cluster_name}-{timestamp}"
-        cmd = f"aws iam create-policy --policy-name {alb_policy_name} --policy-document file://iam_policy_alb.json --profile {self.aws_profile}"
+        cmd = ["aws", "iam", "create-policy", "--policy-name", alb_policy_name,
+               "--policy-document", "file://iam_policy_alb.json", "--profile", self.aws_profile]
         run_command(cmd)  # Ignore if policy exists
 
         # Create service account with explicit role
         print_colored("\nCreating service account for Load Balancer Controller...", "cyan")
-        cmd = (f"eksctl create iamserviceaccount "
-            f"--cluster={self.cluster_name} "
-            f"--namespace=kube-system "
-            f"--name=aws-load-balancer-controller "
-            f"--role-name=AmazonEKSLoadBalancerControllerRole-{self.cluster_name} "
-            f"--attach-policy-arn=arn:aws:iam::{self.aws_account_id}:policy/{alb_policy_name} "
-            f"--override-existing-serviceaccounts "
-            f"--approve "
-            f"--region={self.region}")
+        cmd = ["eksctl", "create", "iamserviceaccount",
+            f"--cluster={self.cluster_name}",
+            "--namespace=kube-system",
+            "--name=aws-load-balancer-controller",
+            f"--role-name=AmazonEKSLoadBalancerControllerRole-{self.cluster_name}",
+            f"--attach-policy-arn=arn:aws:iam::{self.aws_account_id}:policy/{alb_policy_name}",
+            "--override-existing-serviceaccounts",
+            "--approve",
+            f"--region={self.region}"]
 
         if not run_command(cmd)[0]:
             print_colored("Failed to create service account for ALB controller", "red")
@@ -500,47 +588,53 @@ class HopsworksInstaller:
 
         # Install AWS Load Balancer Controller
         print_colored("\nInstalling AWS Load Balancer Controller...", "cyan")
-        cmd = (f"helm install aws-load-balancer-controller eks/aws-load-balancer-controller "
-            f"-n kube-system "
-            f"--set clusterName={self.cluster_name} "
-            f"--set serviceAccount.create=false "
-            f"--set serviceAccount.name=aws-load-balancer-controller "
-            f"--set region={self.region} "
-            f"--set vpcId=$(aws eks describe-cluster --name {self.cluster_name} --query \"cluster.resourcesVpcConfig.vpcId\" --output text --region {self.region}) "
-            f"--set image.repository=602401143452.dkr.ecr.{self.region}.amazonaws.com/amazon/aws-load-balancer-controller "
-            "--set enableServiceMutatorWebhook=false")
+        cmd = ["aws", "eks", "describe-cluster", "--name", self.cluster_name,
+               "--query", "cluster.resourcesVpcConfig.vpcId", "--output", "text", "--region", self.region]
+        success, vpc_id, _ = run_command(cmd, verbose=False)
+        if not success:
+            print_colored("Failed to get the cluster VPC ID", "red")
+            sys.exit(1)
 
-        if not run_command(cmd)[0]:
+        cmd = ["helm", "install", "aws-load-balancer-controller", "aws-load-balancer-controller",
+            "--repo", EKS_HELM_REPO,
+            "-n", "kube-system",
+            "--set", f"clusterName={self.cluster_name}",
+            "--set", "serviceAccount.create=false",
+            "--set", "serviceAccount.name=aws-load-balancer-controller",
+            "--set", f"region={self.region}",
+            "--set", f"vpcId={vpc_id.strip()}",
+            "--set", f"image.repository=602401143452.dkr.ecr.{self.region}.amazonaws.com/amazon/aws-load-balancer-controller",
+            "--set", "enableServiceMutatorWebhook=false"]
+
+        if not run_command(cmd, stream=True)[0]:
             print_colored("Failed to install AWS Load Balancer Controller", "red")
             sys.exit(1)
 
         # 9. Install and configure metrics server
         print_colored("\nInstalling metrics server...", "cyan")
-        metrics_cmd = """
-        kubectl apply -f https://github.com/kubernetes-sigs/metrics-server/releases/latest/download/high-availability-1.21+.yaml && \
-        kubectl patch deployment metrics-server -n kube-system --type=json \
-        -p='[{"op": "add", "path": "/spec/template/spec/containers/0/args/-", "value": "--kubelet-insecure-tls"}]'
-        """
-        if not run_command(metrics_cmd)[0]:
+        metrics_cmds = [
+            ["kubectl", "apply", "-f",
+             "https://github.com/kubernetes-sigs/metrics-server/releases/latest/download/high-availability-1.21+.yaml"],
+            ["kubectl", "patch", "deployment", "metrics-server", "-n", "kube-system", "--type=json",
+             '-p=[{"op": "add", "path": "/spec/template/spec/containers/0/args/-", "value": "--kubelet-insecure-tls"}]']
+        ]
+        if not all(run_command(cmd)[0] for cmd in metrics_cmds):
             print_colored("Failed to install metrics server. Some monitoring features might be limited.", "yellow")
         else:
             print_colored("Metrics server installed and patched for EKS.", "green")
 
         # 10. Verify final deployment
         print_colored("\nVerifying AWS Load Balancer Controller deployment...", "cyan")
-        max_retries = 12
-        for i in range(max_retries):
-            cmd = "kubectl get deployment -n kube-system aws-load-balancer-controller"
-            success, output, _ = run_command(cmd, verbose=False)
-            if success and "1/1" in output:
-                print_colored("AWS Load Balancer Controller is ready!", "green")
-                break
-            if i < max_retries - 1:
-                print_colored(f"Waiting for controller to be ready (attempt {i+1}/{max_retries})...", "yellow")
-                time.sleep(10)
+        # Let the API server watch the rollout instead of polling it
+        cmd = ["kubectl", "wait", "--for=condition=Available", "deployment/aws-load-balancer-controller",
+               "-n", "kube-system", "--timeout=120s"]
+        if run_command(cmd, verbose=False)[0]:
+            print_colored("AWS Load Balancer Controller is ready!", "green")
+        else:
+            print_colored("AWS Load Balancer Controller is not ready yet. Continuing anyway.", "yellow")
 
         # 11. Cleanup temporary files
-        for file in [f'policy-{timestamp}.json', f'eksctl-{timestamp}.yaml', f'storage-class-{timestamp}.yaml', 'iam_policy_alb.json']:
+        for file in [f'policy-{timestamp}.json', f'eksctl-{timestamp}.yaml', 'iam_policy_alb.json']:
             if os.path.exists(file):
                 os.remove(file)
 
@@ -552,10 +646,8 @@ class HopsworksInstaller:
         print_colored("\nSetting up GKE prerequisites...", "blue")
 
         # 1. Get essential info first
-        self.project_id = input("Enter your GCP project ID: ").strip()
-        zone_input = input("Enter your GCP zone (e.g., europe-west1-b). Note: If you select a region like europe-west1, deployments will include all sub-zones (a, b, c), potentially multiplying node counts. Proceed with caution: ").strip()
-        self.zone = zone_input
-        self.region = '-'.join(zone_input.split('-')[:-1])  # extract region from zone
+        self.project_id = self.ask('project_id', "Enter your GCP project ID: ")
+        self.set_gcp_location(self.ask('zone', "Enter your GCP zone (e.g., europe-west1-b). Note: If you select a region like europe-west1, deployments will include all sub-zones (a, b, c), potentially multiplying node counts. Proceed with caution: "))
 
         # 2. Create role with timestamp to avoid collision
         timestamp = int(time.time())
@@ -578,11 +670,12 @@ class HopsworksInstaller:
                     "artifactregistry.repositories.list"
                 ]
             }
-            yaml.dump(role_def, role_file)
+            yaml.dump(role_def, role_file, Dumper=SafeDumper, sort_keys=False)
             role_file.close()
 
             success, _, error = run_command(
-                f"gcloud iam roles create {self.role_name} --project={self.project_id} --file={role_file.name}"
+                ["gcloud", "iam", "roles", "create", self.role_name,
+                 f"--project={self.project_id}", f"--file={role_file.name}"]
             )
             if not success:
                 print_colored(f"Failed to create role: {error}", "red")
@@ -598,16 +691,16 @@ class HopsworksInstaller:
 
         # Check if SA exists first
         success, _, _ = run_command(
-            f"gcloud iam service-accounts describe {self.sa_email} --project={self.project_id}",
+            ["gcloud", "iam", "service-accounts", "describe", self.sa_email, f"--project={self.project_id}"],
             verbose=False
         )
 
         if not success:
             success, _, error = run_command(
-                f"gcloud iam service-accounts create {sa_name} "
-                f"--project={self.project_id} "
-                f"--description='Service account for Hopsworks' "
-                f"--display-name='Hopsworks Service Account'"
+                ["gcloud", "iam", "service-accounts", "create", sa_name,
+                 f"--project={self.project_id}",
+                 "--description=Service account for Hopsworks",
+                 "--display-name=Hopsworks Service Account"]
             )
             if not success and "already exists" not in error:
                 print_colored(f"Failed to create service account: {error}", "red")
@@ -621,16 +714,16 @@ class HopsworksInstaller:
         print_colored("Updating role binding...", "cyan")
         # Remove existing binding if it exists
         run_command(
-            f"gcloud projects remove-iam-policy-binding {self.project_id} "
-            f"--member=serviceAccount:{self.sa_email} "
-            f"--role=projects/{self.project_id}/roles/{self.role_name}",
+            ["gcloud", "projects", "remove-iam-policy-binding", self.project_id,
+             f"--member=serviceAccount:{self.sa_email}",
+             f"--role=projects/{self.project_id}/roles/{self.role_name}"],
             verbose=False
         )
 
         success, _, error = run_command(
-            f"gcloud projects add-iam-policy-binding {self.project_id} "
-            f"--member=serviceAccount:{self.sa_email} "
-            f"--role=projects/{self.project_id}/roles/{self.role_name}"
+            ["gcloud", "projects", "add-iam-policy-binding", self.project_id,
+             f"--member=serviceAccount:{self.sa_email}",
+             f"--role=projects/{self.project_id}/roles/{self.role_name}"]
         )
         if not success:
             print_colored(f"Failed to bind role: {error}", "red")
@@ -639,19 +732,19 @@ class HopsworksInstaller:
             print_colored(f"Role '{self.role_name}' bound to service account '{self.sa_email}'.", "green")
 
         # 5. NOW we can create the cluster with the service account
-        self.cluster_name = input("Enter your GKE cluster name: ").strip() or "hopsworks-cluster"
-        node_count = input("Enter number of nodes (default: 5): ").strip() or "5"
-        machine_type = input("Enter machine type (default: n2-standard-8): ").strip() or "n2-standard-8"
-
-        cluster_cmd = (f"gcloud container clusters create {self.cluster_name} "
-                       f"--zone={self.zone} "
-                       f"--machine-type={machine_type} "
-                       f"--num-nodes={node_count} "
-                       f"--enable-ip-alias "
-                       f"--service-account={self.sa_email}")
+        self.cluster_name = self.ask('cluster_name', "Enter your GKE cluster name: ", "hopsworks-cluster")
+        node_count = self.ask('node_count', "Enter number of nodes (default: 5): ", "5")
+        machine_type = self.ask('machine_type', "Enter machine type (default: n2-standard-8): ", "n2-standard-8")
+
+        cluster_cmd = ["gcloud", "container", "clusters", "create", self.cluster_name,
+                       f"--zone={self.zone}",
+                       f"--machine-type={machine_type}",
+                       f"--num-nodes={node_count}",
+                       "--enable-ip-alias",
+                       f"--service-account={self.sa_email}"]
         
         print_colored("Creating GKE cluster...", "cyan")
-        if not run_command(cluster_cmd)[0]:
+        if not run_command(cluster_cmd, stream=True)[0]:
             print_colored("Failed to create GKE cluster.", "red")
             sys.exit(1)
         else:
@@ -659,17 +752,17 @@ class HopsworksInstaller:
 
         # 6. Configure kubectl
         print_colored("Configuring kubectl...", "cyan")
-        run_command(f"gcloud container clusters get-credentials {self.cluster_name} "
-                    f"--zone={self.zone} "
-                    f"--project={self.project_id}")
+        run_command(["gcloud", "container", "clusters", "get-credentials", self.cluster_name,
+                     f"--zone={self.zone}",
+                     f"--project={self.project_id}"])
 
         # 7. Setup Artifact Registry
         registry_name = f"hopsworks-{self.cluster_name}-{timestamp}"
         print_colored("Creating Artifact Registry repository...", "cyan")
-        success, _, error = run_command(f"gcloud artifacts repositories create {registry_name} "
-                    f"--repository-format=docker "
-                    f"--location={self.region} "
-                    f"--project={self.project_id}")
+        success, _, error = run_command(["gcloud", "artifacts", "repositories", "create", registry_name,
+                                         "--repository-format=docker",
+                                         f"--location={self.region}",
+                                         f"--project={self.project_id}"])
         if not success and "already exists" not in error:
             print_colored(f"Failed to create Artifact Registry: {error}", "red")
             sys.exit(1)
@@ -679,27 +772,36 @@ class HopsworksInstaller:
         # Now, set up GKE authentication
         self.setup_gke_authentication()
 
+    def set_gcp_location(self, zone):
+        """Sets self.zone and derives self.region from it; a region (e.g. europe-west1) is its own region"""
+        self.zone = zone
+        self.region = zone.rsplit('-', 1)[0] if zone.count('-') >= 2 else zone
+
     def setup_gke_authentication(self):
         """Setup GKE auth with proper Workload Identity"""
         # 1. Create and bind Kubernetes service account
         print_colored("Setting up Kubernetes service account...", "cyan")
-        run_command(f"kubectl create namespace {self.namespace} --dry-run=client -o yaml | kubectl apply -f -")
-        run_command(f"kubectl create serviceaccount -n {self.namespace} hopsworks-sa")
+        ensure_namespace(self.namespace)
+
+        # The K8s SA is created already annotated with the GCP SA it impersonates
+        apply_manifest({
+            "apiVersion": "v1",
+            "kind": "ServiceAccount",
+            "metadata": {
+                "name": "hopsworks-sa",
+                "namespace": self.namespace,
+                "annotations": {"iam.gke.io/gcp-service-account": self.sa_email}
+            }
+        })
         
         # Bind the GCP SA to K8s SA
-        workload_binding = (
-            f"gcloud iam service-accounts add-iam-policy-binding {self.sa_email} "
-            f"--role roles/iam.workloadIdentityUser "
-            f"--member \"serviceAccount:{self.project_id}.svc.id.goog[{self.namespace}/hopsworks-sa]\""
-        )
+        workload_binding = [
+            "gcloud", "iam", "service-accounts", "add-iam-policy-binding", self.sa_email,
+            "--role", "roles/iam.workloadIdentityUser",
+            "--member", f"serviceAccount:{self.project_id}.svc.id.goog[{self.namespace}/hopsworks-sa]"
+        ]
         run_command(workload_binding)
 
-        # Annotate the K8s SA
-        run_command(
-            f"kubectl annotate serviceaccount -n {self.namespace} hopsworks-sa "
-            f"iam.gke.io/gcp-service-account={self.sa_email}"
-        )
-
         # 2. Setup Docker config for both GCP and hops.works registries
         docker_config = {
             "credHelpers": {
@@ -708,15 +810,12 @@ class HopsworksInstaller:
             }
         }
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(docker_config, f)
-            config_file = f.name
-
-        run_command(f"kubectl create configmap docker-config -n {self.namespace} "
-                   f"--from-file=config.json={config_file} "
-                   f"--dry-run=client -o yaml | kubectl apply -f -")
-        
-        os.unlink(config_file)
+        apply_manifest({
+            "apiVersion": "v1",
+            "kind": "ConfigMap",
+            "metadata": {"name": "docker-config", "namespace": self.namespace},
+            "data": {"config.json": json.dumps(docker_config)}
+        })
         return True
 
     def setup_aks_prerequisites(self):
@@ -724,42 +823,42 @@ class HopsworksInstaller:
         print_colored("\nSetting up AKS prerequisites...", "blue")
         
         # Verify Azure CLI auth
-        if not run_command("az account show", verbose=False)[0]:
+        if not run_command(["az", "account", "show"], verbose=False)[0]:
             print_colored("Please run 'az login' first.", "red")
             sys.exit(1)
 
         # Get resource group - create if doesn't exist
-        self.resource_group = input("Enter your Azure resource group name: ").strip()
-        location = input("Enter Azure region (eg. eastus): ").strip() or "eastus"
+        self.resource_group = self.ask('resource_group', "Enter your Azure resource group name: ")
+        location = self.ask('location', "Enter Azure region (eg. eastus): ", "eastus")
         
         # Check if resource group exists, create if it doesn't
-        if not run_command(f"az group show --name {self.resource_group}", verbose=False)[0]:
+        if not run_command(["az", "group", "show", "--name", self.resource_group], verbose=False)[0]:
             print_colored(f"Creating resource group {self.resource_group}...", "cyan")
-            if not run_command(f"az group create --name {self.resource_group} --location {location}")[0]:
+            if not run_command(["az", "group", "create", "--name", self.resource_group, "--location", location])[0]:
                 print_colored("Failed to create resource group.", "red")
                 sys.exit(1)
 
         # Get cluster details
-        self.cluster_name = input("Enter your AKS cluster name: ").strip()
-        node_count = input("Enter number of nodes (default: 5): ").strip() or "5"
-        machine_type = input("Enter machine type (default: Standard_D8_v4): ").strip() or "Standard_D8_v4"
+        self.cluster_name = self.ask('cluster_name', "Enter your AKS cluster name: ")
+        node_count = self.ask('node_count', "Enter number of nodes (default: 5): ", "5")
+        machine_type = self.ask('machine_type', "Enter machine type (default: Standard_D8_v4): ", "Standard_D8_v4")
 
         # Create AKS cluster with minimal config but all we need
         print_colored("\nCreating AKS cluster (this will take 5-10 minutes)...", "cyan")
-        cluster_cmd = (
-            f"az aks create "
-            f"--resource-group {self.resource_group} "
-            f"--name {self.cluster_name} "
-            f"--node-count {node_count} "
-            f"--node-vm-size {machine_type} "
-            f"--location {location} "
-            f"--network-plugin azure "
-            f"--generate-ssh-keys "
-            f"--load-balancer-sku standard "  
-            f"--enable-managed-identity " 
-            f"--network-policy azure " 
-            f"--no-wait" 
-        )
+        cluster_cmd = [
+            "az", "aks", "create",
+            "--resource-group", self.resource_group,
+            "--name", self.cluster_name,
+            "--node-count", node_count,
+            "--node-vm-size", machine_type,
+            "--location", location,
+            "--network-plugin", "azure",
+            "--generate-ssh-keys",
+            "--load-balancer-sku", "standard",
+            "--enable-managed-identity",
+            "--network-policy", "azure",
+            "--no-wait"
+        ]
         
         if not run_command(cluster_cmd)[0]:
             print_colored("Failed to start AKS cluster creation.", "red")
@@ -767,51 +866,43 @@ class HopsworksInstaller:
 
         # Wait for cluster to be ready
         print_colored("\nWaiting for cluster to be ready...", "cyan")
-        while True:
-            success, output, _ = run_command(
-                f"az aks show --resource-group {self.resource_group} --name {self.cluster_name} --query provisioningState -o tsv",
-                verbose=False
-            )
-            if success and "Succeeded" in output:
-                break
-            print_colored("Still creating cluster...", "yellow")
-            time.sleep(30)
+        cmd = ["az", "aks", "wait", "--created", "--resource-group", self.resource_group,
+               "--name", self.cluster_name, "--interval", "30"]
+        if not run_command(cmd, verbose=False)[0]:
+            print_colored("AKS cluster did not become ready.", "red")
+            sys.exit(1)
 
         # Get credentials
         print_colored("\nGetting kubectl credentials...", "cyan")
-        cmd = f"az aks get-credentials --resource-group {self.resource_group} --name {self.cluster_name} --overwrite-existing"
+        cmd = ["az", "aks", "get-credentials", "--resource-group", self.resource_group,
+               "--name", self.cluster_name, "--overwrite-existing"]
         if not run_command(cmd)[0]:
             print_colored("Failed to get AKS credentials.", "red")
             sys.exit(1)
 
         # Create namespace and setup basic RBAC
         print_colored(f"\nCreating namespace {self.namespace} and setting up RBAC...", "cyan")
-        run_command(f"kubectl create namespace {self.namespace}")
+        ensure_namespace(self.namespace)
         
         # Create a more permissive service account for Hopsworks
-        sa_yaml = f"""apiVersion: v1
-kind: ServiceAccount
-metadata:
-  name: hopsworks-sa
-  namespace: {self.namespace}
----
-apiVersion: rbac.authorization.k8s.io/v1
-kind: RoleBinding
-metadata:
-  name: hopsworks-admin
-  namespace: {self.namespace}
-roleRef:
-  apiGroup: rbac.authorization.k8s.io
-  kind: ClusterRole
-  name: admin
-subjects:
-- kind: ServiceAccount
-  name: hopsworks-sa
-  namespace: {self.namespace}"""
-        with open('sa.yaml', 'w') as f:
-            f.write(sa_yaml)
-        
-        run_command("kubectl apply -f sa.yaml")
+        apply_manifest({
+            "apiVersion": "v1",
+            "kind": "List",
+            "items": [
+                {
+                    "apiVersion": "v1",
+                    "kind": "ServiceAccount",
+                    "metadata": {"name": "hopsworks-sa", "namespace": self.namespace}
+                },
+                {
+                    "apiVersion": "rbac.authorization.k8s.io/v1",
+                    "kind": "RoleBinding",
+                    "metadata": {"name": "hopsworks-admin", "namespace": self.namespace},
+                    "roleRef": {"apiGroup": "rbac.authorization.k8s.io", "kind": "ClusterRole", "name": "admin"},
+                    "subjects": [{"kind": "ServiceAccount", "name": "hopsworks-sa", "namespace": self.namespace}]
+                }
+            ]
+        })
 
         print_colored("\nAKS prerequisites setup completed successfully!", "green")
         return True
@@ -822,13 +913,13 @@ subjects:
         
         # Get Docker registry credentials with basic validation
         while True:
-            docker_user = input("Enter your Hopsworks Docker registry username: ").strip()
+            docker_user = self.ask('docker_username', "Enter your Hopsworks Docker registry username: ")
             if docker_user:
                 break
             print_colored("Username cannot be empty.", "yellow")
         
         while True:
-            docker_pass = input("Enter your Hopsworks Docker registry password: ").strip()
+            docker_pass = self.ask('docker_password', "Enter your Hopsworks Docker registry password: ", secret=True)
             if docker_pass:
                 break
             print_colored("Password cannot be empty.", "yellow")
@@ -847,50 +938,61 @@ subjects:
             }
         ]
         
+        def create_secret(secret_config):
+            # Same layout `kubectl create secret docker-registry` produces; apply updates an existing secret
+            auth = base64.b64encode(f"{docker_user}:{docker_pass}".encode()).decode()
+            docker_config = {
+                "auths": {
+                    secret_config['server']: {
+                        "username": docker_user,
+                        "password": docker_pass,
+                        "email": "noreply@hopsworks.ai",
+                        "auth": auth
+                    }
+                }
+            }
+            secret = {
+                "apiVersion": "v1",
+                "kind": "Secret",
+                "metadata": {"name": secret_config['name'], "namespace": self.namespace},
+                "type": "kubernetes.io/dockerconfigjson",
+                "data": {".dockerconfigjson": base64.b64encode(json.dumps(docker_config).encode()).decode()}
+            }
+            success, output, error = apply_manifest(secret, verbose=False)
+            if not success and "field is immutable" in error:
+                # An existing secret of another type can't be changed in place, so replace it
+                delete_cmd = ["kubectl", "delete", "secret", secret_config['name'], "-n", self.namespace, "--ignore-not-found=true"]
+                run_command(delete_cmd, verbose=False)
+                success, output, error = apply_manifest(secret, verbose=False)
+            return success, output, error
+
         # Track if we've successfully created the required secrets
         required_secrets_created = False
         
         for secret_config in registry_secrets:
             print_colored(f"\nCreating secret {secret_config['name']}...", "cyan")
-            
-            # First try to delete any existing secret
-            cleanup_cmd = f"kubectl delete secret {secret_config['name']} -n {self.namespace} --ignore-not-found=true"
-            run_command(cleanup_cmd, verbose=False)
-            
-            # Create the new secret
-            create_cmd = (
-                f"kubectl create secret docker-registry {secret_config['name']} "
-                f"--namespace={self.namespace} "
-                f"--docker-server={secret_config['server']} "
-                f"--docker-username={docker_user} "
-                f"--docker-password={docker_pass} "
-                "--docker-email=noreply@hopsworks.ai"
-            )
-            
-            success, output, error = run_command(create_cmd)
-            
+            success, output, error = create_secret(secret_config)
             if success:
                 print_colored(f"Successfully created secret {secret_config['name']}", "green")
                 if secret_config['required']:
                     required_secrets_created = True
             else:
-                error_msg = f"Failed to create secret {secret_config['name']}"
-                if "already exists" in error:
-                    print_colored(f"{error_msg} (already exists)", "yellow")
-                    if secret_config['required']:
-                        required_secrets_created = True
-                else:
-                    print_colored(f"{error_msg}: {error}", "red")
-                    if secret_config['required'] and not required_secrets_created:
-                        print_colored("Failed to create required registry secret. Cannot proceed.", "red")
-                        sys.exit(1)
+                print_colored(f"Failed to create secret {secret_config['name']}: {error}", "red")
+                if secret_config['required'] and not required_secrets_created:
+                    print_colored("Failed to create required registry secret. Cannot proceed.", "red")
+                    sys.exit(1)
+
+        # The password only lives on in the cluster secrets from here on
+        docker_pass = None
+        self.config.pop('docker_password', None)
 
         # Verify the secrets were created
         print_colored("\nVerifying registry secrets...", "cyan")
-        verify_cmd = f"kubectl get secrets -n {self.namespace} | grep -E 'regcred|hopsworks-registry-secret'"
+        verify_cmd = ["kubectl", "get", "secret", "regcred", "hopsworks-registry-secret",
+                      "-n", self.namespace, "-o", "name", "--ignore-not-found"]
         success, output, _ = run_command(verify_cmd, verbose=False)
         
-        if success and 'regcred' in output:
+        if success and 'secret/regcred' in output.split():
             print_colored("\nRegistry secrets setup completed successfully.", "green")
             # Store this for potential use in other methods
             self.registry_secrets_created = True
@@ -906,8 +1008,7 @@ subjects:
         while True:
             self.kubeconfig_path, self.cluster_name, self.region = self.setup_kubeconfig()
             if self.kubeconfig_path:
-                # Set the provided config as current context
-                run_command(f"kubectl config use-context $(kubectl config current-context --kubeconfig={self.kubeconfig_path})")
+                # KUBECONFIG already points at the provided config, so its current context is the one in use
                 if self.verify_kubeconfig():
                     break
             else:
@@ -924,12 +1025,12 @@ subjects:
 
         if self.environment == "AWS":
             # Existing AWS logic
-            cluster_name = input("Enter your EKS cluster name: ").strip()
+            cluster_name = self.ask('cluster_name', "Enter your EKS cluster name: ")
             region = self.get_aws_region()
-            cmd = f"aws eks get-token --cluster-name {cluster_name} --region {region}"
+            cmd = ["aws", "eks", "get-token", "--cluster-name", cluster_name, "--region", region]
             if not run_command(cmd)[0]:
                 print_colored("Failed to get EKS token. Updating kubeconfig...", "yellow")
-                cmd = f"aws eks update-kubeconfig --name {cluster_name} --region {region}"
+                cmd = ["aws", "eks", "update-kubeconfig", "--name", cluster_name, "--region", region]
                 if not run_command(cmd)[0]:
                     print_colored("Failed to update kubeconfig.", "red")
                     return None, None, None
@@ -937,27 +1038,27 @@ subjects:
 
         elif self.environment == "GCP":
             if self.args.loadbalancer_only:
-                cluster_name = input("Enter your GKE cluster name: ").strip()
-                self.project_id = input("Enter your GCP project ID: ").strip()
-                zone_input = input("Enter your GCP zone (e.g. europe-west1-b): ").strip()
-                self.zone = zone_input
-                self.region = '-'.join(zone_input.split('-')[:-1])  # extract region from zone
+                cluster_name = self.ask('cluster_name', "Enter your GKE cluster name: ")
+                self.project_id = self.ask('project_id', "Enter your GCP project ID: ")
+                self.set_gcp_location(self.ask('zone', "Enter your GCP zone (e.g. europe-west1-b): "))
             else:
                 # Since we handle GCP kubeconfig in setup_gke_prerequisites, skip here
                 cluster_name = self.cluster_name
 
-            cmd = f"gcloud container clusters get-credentials {cluster_name} --project {self.project_id} --zone {self.zone}"
+            cmd = ["gcloud", "container", "clusters", "get-credentials", cluster_name,
+                   "--project", self.project_id, "--zone", self.zone]
             if not run_command(cmd)[0]:
                 print_colored("Failed to get GKE credentials. Check your gcloud setup.", "red")
                 return None, None, None
 
-            run_command("gcloud auth configure-docker", verbose=False)
+            run_command(["gcloud", "auth", "configure-docker"], verbose=False)
             kubeconfig_path = os.path.expanduser("~/.kube/config")
 
         elif self.environment == "Azure":
-            self.resource_group = input("Enter your Azure resource group name: ").strip()
-            cluster_name = input("Enter your AKS cluster name: ").strip()
-            cmd = f"az aks get-credentials --resource-group {self.resource_group} --name {cluster_name} --overwrite-existing"
+            self.resource_group = self.ask('resource_group', "Enter your Azure resource group name: ")
+            cluster_name = self.ask('cluster_name', "Enter your AKS cluster name: ")
+            cmd = ["az", "aks", "get-credentials", "--resource-group", self.resource_group,
+                   "--name", cluster_name, "--overwrite-existing"]
             if not run_command(cmd)[0]:
                 print_colored("Failed to get AKS credentials. Check your Azure CLI configuration and permissions.", "red")
                 return None, None, None
@@ -965,7 +1066,7 @@ subjects:
 
         else:
             # Other environments
-            kubeconfig_path = input("Enter the path to your kubeconfig file: ").strip()
+            kubeconfig_path = self.ask('kubeconfig_path', "Enter the path to your kubeconfig file: ")
             kubeconfig_path = os.path.expanduser(kubeconfig_path)
             if not os.path.exists(kubeconfig_path):
                 print_colored(f"The file {kubeconfig_path} does not exist. Check the path and try again.", "red")
@@ -973,8 +1074,7 @@ subjects:
 
         if kubeconfig_path:
             os.environ['KUBECONFIG'] = kubeconfig_path
-            with open('set_kubeconfig.sh', 'w') as f:
-                f.write(f"export KUBECONFIG={kubeconfig_path}\n")
+            write_file('set_kubeconfig.sh', f"export KUBECONFIG={shlex.quote(kubeconfig_path)}\n")
             print("\nTo use kubectl in your current shell, run:")
             print("source set_kubeconfig.sh")
 
@@ -983,18 +1083,28 @@ subjects:
     def verify_kubeconfig(self):
         print_colored("\nVerifying kubeconfig...", "cyan")
 
-        # Check current context
-        cmd = "kubectl config current-context"
-        success, output, error = run_command(cmd, verbose=True)
-        if not success:
-            print_colored(f"Failed to get current context. Error: {error}", "red")
+        # Read the current context straight from the kubeconfig files, no need for a kubectl process
+        current_context = None
+        kubeconfig_files = os.environ.get('KUBECONFIG') or os.path.expanduser("~/.kube/config")
+        for path in filter(None, kubeconfig_files.split(os.pathsep)):
+            try:
+                with open(path) as f:
+                    current_context = (yaml.safe_load(f) or {}).get('current-context')
+            except (OSError, yaml.YAMLError):
+                continue
+            if current_context:
+                break
+        if not current_context:
+            print_colored("Failed to get current context. No current-context set in the kubeconfig.", "red")
             return False
+        print(current_context)
 
-        # Try to list namespaces
-        cmd = "kubectl get namespaces"
+        # One call checks both that the API server is reachable and that we can authenticate;
+        # the timeout makes an unreachable cluster fail fast instead of hanging
+        cmd = ["kubectl", "cluster-info", "--request-timeout=10s"]
         success, output, error = run_command(cmd, verbose=True)
         if not success:
-            print_colored(f"Failed to list namespaces. Error: {error}", "red")
+            print_colored(f"Failed to reach the cluster. Error: {error}", "red")
             return False
 
         print_colored("Kubeconfig verified successfully.", "green")
@@ -1006,12 +1116,14 @@ subjects:
             tools.append("gcloud")
         elif self.environment == "AWS":
             tools.append("aws")
+            if not self.args.loadbalancer_only:
+                tools.append("eksctl")  # Creates the EKS cluster
         elif self.environment == "Azure":
             tools.append("az")
-        for tool in tools:
-            if not shutil.which(tool):
-                print_colored(f"{tool} not found. Please install it and try again.", "red")
-                sys.exit(1)
+        missing = [tool for tool in tools if not shutil.which(tool)]
+        if missing:
+            print_colored(f"{', '.join(missing)} not found. Please install and try again.", "red")
+            sys.exit(1)
 
     def parse_arguments(self):
         parser = argparse.ArgumentParser(description="Hopsworks Installation Script")
@@ -1019,11 +1131,29 @@ subjects:
         parser.add_argument('--no-user-data', action='store_true', help='Skip sending user data')
         parser.add_argument('--skip-license', action='store_true', help='Skip license agreement step')
         parser.add_argument('--namespace', default='hopsworks', help='Namespace for Hopsworks installation')
+        parser.add_argument('--config', help='YAML file with answers to the installer prompts')
         self.args = parser.parse_args()
         self.namespace = self.args.namespace
+        if self.args.config:
+            try:
+                with open(self.args.config) as f:
+                    self.config = yaml.safe_load(f) or {}
+            except (OSError, yaml.YAMLError) as e:
+                print_colored(f"Failed to read config file {self.args.config}: {e}", "red")
+                sys.exit(1)
+            if not isinstance(self.config, dict):
+                print_colored(f"Config file {self.args.config} must contain a mapping of prompt keys to answers.", "red")
+                sys.exit(1)
 
     def get_deployment_environment(self):
         environments = ["AWS", "Azure", "GCP", "OVH"]
+        if 'environment' in self.config:
+            if self.config['environment'] not in environments:
+                print_colored(f"Invalid environment '{self.config['environment']}' in config file. "
+                              f"Expected one of: {', '.join(environments)}", "red")
+                sys.exit(1)
+            self.environment = self.config['environment']
+            return
         print_colored("Select your deployment environment:", "blue")
         for i, env in enumerate(environments, 1):
             print(f"{i}. {env}")
@@ -1036,7 +1166,7 @@ subjects:
     def get_aws_region(self):
         region = os.environ.get('AWS_REGION')
         if not region:
-            region = input("Enter your AWS region (e.g., us-east-2): ").strip()
+            region = self.ask('region', "Enter your AWS region (e.g., us-east-2): ")
             os.environ['AWS_REGION'] = region
         return region
 
@@ -1073,10 +1203,10 @@ subjects:
                 registry_name = f"hopsworks-{self.cluster_name}-{timestamp}"
                 
                 # Create Artifact Registry repository
-                run_command(f"gcloud artifacts repositories create {registry_name} "
-                            f"--repository-format=docker "
-                            f"--location={self.region} "
-                            f"--project={self.project_id}")
+                run_command(["gcloud", "artifacts", "repositories", "create", registry_name,
+                             "--repository-format=docker",
+                             f"--location={self.region}",
+                             f"--project={self.project_id}"])
 
                 self.managed_registry_info = {
                     "domain": f"{self.region}-docker.pkg.dev",
@@ -1109,31 +1239,17 @@ subjects:
         """Installs Hopsworks consistently across all cloud providers"""
         print_colored("\nInstalling Hopsworks...", "blue")
 
-        # Setup helm repos - this part works, keep it
-        if not run_command("helm repo add hopsworks https://nexus.hops.works/repository/hopsworks-helm --force-update")[0]:
-            print_colored("Failed to add Hopsworks Helm repo.", "red")
-            return False
-
-        if not run_command("helm repo update")[0]:
-            print_colored("Failed to update Helm repos.", "red")
-            return False
-
-        # Clean up and get fresh chart - this is good practice, keep it
-        if os.path.exists('hopsworks'):
-            shutil.rmtree('hopsworks', ignore_errors=True)
+        # No `helm repo add`: the chart is installed with --repo, see construct_helm_command
 
-        if not run_command("helm pull hopsworks/hopsworks --untar --devel")[0]:
-            print_colored("Failed to pull Hopsworks chart.", "red")
-            return False
-        
         # Prepare namespace - good to keep
-        if not run_command(f"kubectl create namespace {self.namespace} --dry-run=client -o yaml | kubectl apply -f -")[0]:
+        if not ensure_namespace(self.namespace)[0]:
             print_colored("Failed to create namespace", "red")
             return False
-        time.sleep(5)  # Keep the settle time
 
-        # Construct helm command using our new configuration method
-        helm_command = self.construct_helm_command()
+        # All values go to helm in one values file rather than a --set per key
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as values_file:
+            yaml.dump(self.construct_helm_values(), values_file, Dumper=SafeDumper, sort_keys=False)
+        helm_command = self.construct_helm_command(values_file.name)
 
         # Execute helm install with progress monitoring
         print_colored("Starting Hopsworks installation...", "cyan")
@@ -1142,78 +1258,81 @@ subjects:
         status_thread.start()
 
         try:
-            success, output, error = run_command(helm_command)
-            if not success:
-                # Only ignore known non-fatal errors
-                if not any(err in error for err in KNOWN_NONFATAL_ERRORS):
-                    print_colored("\nHopsworks installation failed.", "red")
-                    print_colored("Error: " + error, "red")
-                    return False
-                print_colored(f"\nIgnoring expected configuration message: {error}", "yellow")
-                
-            # Wait for actual deployment readiness regardless of helm command result
-            return wait_for_deployment(self.namespace)
+            success, output, error = run_command(helm_command, stream=True)
         finally:
+            # wait_for_deployment reports its own progress, so the pod watch is only needed while helm runs
             stop_event.set()
             status_thread.join()
+            os.unlink(values_file.name)
+
+        if not success:
+            # Only ignore known non-fatal errors
+            if not KNOWN_NONFATAL_ERRORS_RE.search(error):
+                print_colored("\nHopsworks installation failed.", "red")
+                print_colored("Error: " + error, "red")
+                return False
+            print_colored(f"\nIgnoring expected configuration message: {error}", "yellow")
+
+        # Wait for actual deployment readiness regardless of helm command result
+        return wait_for_deployment(self.namespace)
                                         
     def get_load_balancer_address(self):
         """Get LoadBalancer address with more robust detection"""
-        # Try both hostname and IP - some providers might give either
-        commands = [
-            "kubectl get svc -n {ns} hopsworks-release -o jsonpath='{{.status.loadBalancer.ingress[0].hostname}}'",
-            "kubectl get svc -n {ns} hopsworks-release -o jsonpath='{{.status.loadBalancer.ingress[0].ip}}'"
-        ]
-        
-        for cmd in commands:
-            formatted_cmd = cmd.format(ns=self.namespace)
-            success, output, _ = run_command(formatted_cmd, verbose=False)
-            if success and output.strip():
-                return output.strip()
+        # Fetch both hostname and IP in one call - some providers might give either
+        cmd = ["kubectl", "get", "svc", "-n", self.namespace, "hopsworks-release", "-o",
+               "jsonpath={.status.loadBalancer.ingress[0].hostname} {.status.loadBalancer.ingress[0].ip}"]
+        success, output, _ = run_command(cmd, verbose=False, capture_stderr=False)
+        if success and output.split():
+            return output.split()[0]
                 
-        # Fallback - check all LoadBalancer services
+        # Fallback - check all LoadBalancer services, only the address fields are sent back, one service per line
         print_colored("Retrying LoadBalancer address detection...", "yellow")
-        cmd = f"kubectl get svc -n {self.namespace} -o wide | grep LoadBalancer | grep hopsworks-release"
-        success, output, _ = run_command(cmd, verbose=False)
-        
-        if success and output.strip():
-            parts = output.split()
-            if len(parts) >= 6:  # Standard kubectl output format
-                external_ip = parts[5]
-                if external_ip != '<pending>' and external_ip != '<none>':
-                    return external_ip
-        
-        # Last resort - get ALL LoadBalancer services
-        cmd = f"kubectl get svc -n {self.namespace} --field-selector type=LoadBalancer -o json"
-        success, output, _ = run_command(cmd, verbose=False)
+        cmd = ["kubectl", "get", "svc", "-n", self.namespace, "--field-selector", "type=LoadBalancer", "-o",
+               "jsonpath={range .items[*]}{.status.loadBalancer.ingress[0].hostname} {.status.loadBalancer.ingress[0].ip}{\"\\n\"}{end}"]
+        success, output, _ = run_command(cmd, verbose=False, capture_stderr=False)
         if success:
-            import json
-            try:
-                services = json.loads(output)
-                for svc in services.get('items', []):
-                    ingress = svc.get('status', {}).get('loadBalancer', {}).get('ingress', [])
-                    if ingress:
-                        return ingress[0].get('hostname') or ingress[0].get('ip')
-            except json.JSONDecodeError:
-                pass
+            for line in output.splitlines():
+                if line.split():
+                    return line.split()[0]
                 
         return None
 
+    def watch_load_balancer_address(self, timeout=120):
+        """Follows the hopsworks-release service until the cloud provider assigns it an address.
+
+        The watch is restarted if kubectl exits early, e.g. with NotFound before the service exists.
+        """
+        cmd = ["kubectl", "get", "svc", "-n", self.namespace, "hopsworks-release", "--watch", "-o",
+               "jsonpath={.status.loadBalancer.ingress[0].hostname} {.status.loadBalancer.ingress[0].ip}{\"\\n\"}"]
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            except OSError:
+                return None
+            # The watch blocks until the service changes, so end it from the side when time is up
+            timer = threading.Timer(max(deadline - time.time(), 0), process.terminate)
+            timer.start()
+            try:
+                for line in process.stdout:
+                    if line.split():
+                        return line.split()[0]
+            finally:
+                timer.cancel()
+                process.terminate()
+                process.wait()
+            time.sleep(min(5, max(deadline - time.time(), 0)))  # Don't spin if kubectl keeps failing
+        return None
+
     def finalize_installation(self):
         """Simple installation finalization focused on LoadBalancer"""
         print_colored("\nFinalizing installation...", "blue")
         
-        # Give the LoadBalancer some time to get an address
-        max_retries = 12  # 2 minutes total
-        address = None
-        
-        for i in range(max_retries):
-            address = self.get_load_balancer_address()
-            if address:
-                break
-            if i < max_retries - 1:  # Don't sleep on last iteration
-                print_colored("Waiting for LoadBalancer address...", "yellow")
-                time.sleep(10)
+        address = self.get_load_balancer_address()
+        if not address:
+            # Give the LoadBalancer up to 2 minutes to get an address
+            print_colored("Waiting for LoadBalancer address...", "yellow")
+            address = self.watch_load_balancer_address() or self.get_load_balancer_address()
         
         if not address:
             print_colored("Failed to obtain LoadBalancer address. Manual configuration may be needed.", "red")
@@ -1232,19 +1351,52 @@ subjects:
 
 # Installation utillities 
 def periodic_status_update(stop_event, namespace):
+    """Reports how many pods exist, updating only when kubectl's watch reports a pod change.
+
+    The watch is restarted if kubectl exits early, e.g. when the API server closes it.
+    """
+    cmd = ["kubectl", "get", "pods", "-n", namespace, "--watch", "--output-watch-events",
+           "-o", "jsonpath={.type} {.object.metadata.name}{\"\\n\"}"]
+    print_colored("\rWaiting for pods to be created... Do not panic. This will take a moment", "yellow", end='')
+    sys.stdout.flush()
+    current = {}  # The running watch, for the terminator thread
+
+    def terminate_on_stop():
+        # The watch blocks until the next event, so end it from the side once we're told to stop
+        stop_event.wait()
+        process = current.get('process')
+        if process:
+            process.terminate()
+
+    threading.Thread(target=terminate_on_stop, daemon=True).start()
     while not stop_event.is_set():
-        cmd = f"kubectl get pods -n {namespace} --no-headers"
-        success, output, error = run_command(cmd, verbose=False)
-        if success and output.strip():
-            pod_count = len(output.strip().split('\n'))
-            print_colored(f"\rCurrent status: {pod_count} pods created", "cyan", end='')
-        else:
-            if "No resources found" in error:
-                print_colored("\rWaiting for pods to be created... Do not panic. This will take a moment", "yellow", end='')
+        try:
+            # Nothing reads stderr while the watch runs, so a pipe there could fill up and stall kubectl
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            print_colored(f"\rError checking pod status: {e}", "red")
+            return
+        current['process'] = process
+        if stop_event.is_set():
+            # Stopped while the watch was starting, after the terminator already ran
+            process.terminate()
+
+        # A new watch starts by listing every existing pod again, so start from scratch
+        pods = set()
+        for line in process.stdout:
+            event, _, pod = line.strip().partition(" ")
+            if not pod:
+                continue
+            if event == "DELETED":
+                pods.discard(pod)
             else:
-                print_colored(f"\rError checking pod status: {error.strip()}", "red", end='')
-        sys.stdout.flush()  # Ensure the output is displayed immediately
-        time.sleep(10)  # Update every 10 seconds
+                pods.add(pod)
+            print_colored(f"\rCurrent status: {len(pods)} pods created", "cyan", end='')
+            sys.stdout.flush()  # Ensure the output is displayed immediately
+        process.wait()
+        if not stop_event.is_set() and process.returncode:
+            print_colored(f"\rError checking pod status: kubectl exited with code {process.returncode}", "red", end='')
+        stop_event.wait(5)  # Don't spin if kubectl keeps failing
     print()  # Print a newline when done to move to the next line
 
 def get_license_agreement():
@@ -1337,8 +1489,9 @@ def wait_for_deployment(namespace, timeout=2700):
     def check_status():
         """Check if deployment is ready"""
         # Check jobs
-        cmd = f"kubectl get jobs -n {namespace} -o custom-columns=NAME:.metadata.name,STATUS:.status.conditions[*].type"
-        success, output, _ = run_command(cmd, verbose=False)
+        cmd = ["kubectl", "get", "jobs", "-n", namespace,
+               "-o", "custom-columns=NAME:.metadata.name,STATUS:.status.conditions[*].type"]
+        success, output, _ = run_command(cmd, verbose=False, capture_stderr=False)
         
         if not success or not output.strip():
             return False, 0, 0
@@ -1346,19 +1499,22 @@ def wait_for_deployment(namespace, timeout=2700):
         jobs = [line.split() for line in output.strip().split('\n')[1:]]
         incomplete_jobs = [job[0] for job in jobs if "Complete" not in job[-1] and "SuccessCriteriaMet" not in job[-1]]
         
-        # Check core service(s)
+        total_jobs = len(jobs)
+        complete_jobs = total_jobs - len(incomplete_jobs)
+        if incomplete_jobs:
+            return False, complete_jobs, total_jobs
+
+        # Check core service(s) once the jobs are done; the API server holds the wait
+        # open until the pods turn Ready, so readiness is seen as soon as it happens
         services_ready = True
         for svc in ["hopsworks-instance"]:
-            cmd = f"kubectl get pods -n {namespace} -l app={svc} -o jsonpath='{{.items[0].status.phase}}'"
-            success, status, _ = run_command(cmd, verbose=False)
-            if not success or status.strip() != "Running":
+            cmd = ["kubectl", "wait", "--for=condition=Ready", "pod", "-l", f"app={svc}",
+                   "-n", namespace, "--timeout=5s"]
+            if not run_command(cmd, verbose=False, capture_stderr=False)[0]:
                 services_ready = False
                 break
-                
-        total_jobs = len(jobs)
-        complete_jobs = total_jobs - len(incomplete_jobs)
         
-        return services_ready and not incomplete_jobs, complete_jobs, total_jobs
+        return services_ready, complete_jobs, total_jobs
 
     def key_listener():
         """Listen for keypress to override"""
@@ -1369,7 +1525,7 @@ def wait_for_deployment(namespace, timeout=2700):
                     key = msvcrt.getch()
                     if key == b'1':
                         override_flag.set()
-                threading.Event().wait(0.1)
+                override_flag.wait(0.1)
         else:
             old_settings = termios.tcgetattr(sys.stdin)
             try:
@@ -1380,12 +1536,21 @@ def wait_for_deployment(namespace, timeout=2700):
             finally:
                 termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
 
+    # A release that is already up (e.g. on a re-run) needs no monitoring, so check once
+    # before putting the terminal into cbreak mode for the key listener
+    if check_status()[0]:
+        print_colored("All jobs complete and core services are ready!", "green")
+        return True
+
     # Start key listener in background
     listener = threading.Thread(target=key_listener, daemon=True)
     listener.start()
     
     print_colored("Press '1' at any time to proceed anyway", "yellow")
     
+    # Poll quickly while jobs are finishing and back off while nothing changes
+    interval = 2
+    last_complete_jobs = None
     try:
         while True:
             # Check for override
@@ -1398,9 +1563,9 @@ def wait_for_deployment(namespace, timeout=2700):
             if (time.time() - start_time) >= timeout:
                 print_colored(f"\nTimeout after {timeout/60:.1f} minutes.", "yellow")
                 print_colored("Press '1' to proceed anyway, or Ctrl+C to abort", "cyan")
-                # Wait for override or interrupt
-                while not override_flag.is_set():
-                    time.sleep(1)
+                # Wait for override or interrupt; the timeout keeps Ctrl+C responsive
+                while not override_flag.wait(1):
+                    pass
                 print_colored("\nProceeding despite timeout!", "yellow")
                 return True
                 
@@ -1417,7 +1582,14 @@ def wait_for_deployment(namespace, timeout=2700):
             progress = (complete_jobs / total_jobs * 100) if total_jobs > 0 else 0
             print_colored(f"\rProgress: {progress:.1f}% ({complete_jobs}/{total_jobs} jobs) | {elapsed}s elapsed | Press '1' to proceed", "cyan", end='')
             
-            time.sleep(5)
+            if complete_jobs != last_complete_jobs:
+                interval = 2
+                last_complete_jobs = complete_jobs
+            else:
+                interval = min(interval * 2, 15)
+
+            # Sleep until the next check, waking straight away if '1' is pressed
+            override_flag.wait(interval)
             
     except KeyboardInterrupt:
         print("\n")
@@ -1429,10 +1601,12 @@ def wait_for_deployment(namespace, timeout=2700):
 def health_check(namespace):
     print_colored("\nPerforming basic health check...", "blue")
 
-    cmd = f"kubectl get pods -n {namespace} -o jsonpath='{{.items[*].status.phase}}'"
-    success, output, _ = run_command(cmd, verbose=False)
-    if not success or 'Running' not in output:
-        print_colored("Not all pods are in Running state. Health check failed.", "red")
+    # Check readiness once; finished job pods, including failed attempts that were retried,
+    # never become Ready, so leave them out
+    cmd = ["kubectl", "wait", "--for=condition=Ready", "pod", "--all", "-n", namespace,
+           "--field-selector=status.phase!=Succeeded,status.phase!=Failed", "--timeout=0s"]
+    if not run_command(cmd, verbose=False, capture_stderr=False)[0]:
+        print_colored("Not all pods are Ready. Health check failed.", "red")
         return False
 
     print_colored("Basic health check passed.", "green")
@@ -35,6 +35,28 @@ confirm() {
     done
 }
 
+# Function to delete forwarding rules of one region in a single call, an empty region means global rules
+delete_forwarding_rules() {
+    local region="$1"
+    shift
+    if [ $# -eq 0 ]; then
+        return
+    fi
+    if [ -n "$region" ]; then
+        echo "Deleting load balancers in region $region: $*"
+        gcloud compute forwarding-rules delete "$@" \
+            --region "$region" \
+            --project "$PROJECT_ID" \
+            --quiet
+    else
+        echo "Deleting global load balancers: $*"
+        gcloud compute forwarding-rules delete "$@" \
+            --global \
+            --project "$PROJECT_ID" \
+            --quiet
+    fi
+}
+
 # Function to check if a resource exists
 resource_exists() {
     if [ -n "$1" ]; then
@@ -63,14 +85,13 @@ fi
 
 # Find all GKE clusters in the project
 echo -e "\n${YELLOW}Checking for GKE clusters...${NC}"
-CLUSTERS=$(gcloud container clusters list --project "$PROJECT_ID" --format="table(name,zone,status)" 2>/dev/null)
+CLUSTERS=$(gcloud container clusters list --project "$PROJECT_ID" --format="value(name,zone,status)" 2>/dev/null)
 if resource_exists "$CLUSTERS"; then
     echo -e "Found clusters:\n$CLUSTERS"
     if confirm "Would you like to delete these GKE clusters?"; then
         while IFS= read -r cluster_info; do
-            if [ -n "$cluster_info" ] && [[ ! "$cluster_info" =~ "NAME" ]]; then
-                CLUSTER_NAME=$(echo "$cluster_info" | awk '{print $1}')
-                ZONE=$(echo "$cluster_info" | awk '{print $2}')
+            if [ -n "$cluster_info" ]; then
+                read -r CLUSTER_NAME ZONE _ <<< "$cluster_info"
                 echo "Deleting cluster $CLUSTER_NAME in zone $ZONE..."
                 gcloud container clusters delete "$CLUSTER_NAME" \
                     --zone "$ZONE" \
@@ -85,19 +106,17 @@ fi
 
 # Check for Hopsworks namespaces
 echo -e "\n${YELLOW}Checking for Hopsworks resources...${NC}"
-CLUSTERS_WITH_CREDS=$(gcloud container clusters list --project "$PROJECT_ID" --format="table(name,zone)" 2>/dev/null)
+CLUSTERS_WITH_CREDS=$(gcloud container clusters list --project "$PROJECT_ID" --format="value(name,zone)" 2>/dev/null)
 if resource_exists "$CLUSTERS_WITH_CREDS"; then
     while IFS= read -r cluster_info; do
-        if [ -n "$cluster_info" ] && [[ ! "$cluster_info" =~ "NAME" ]]; then
-            CLUSTER_NAME=$(echo "$cluster_info" | awk '{print $1}')
-            ZONE=$(echo "$cluster_info" | awk '{print $2}')
+        if [ -n "$cluster_info" ]; then
+            read -r CLUSTER_NAME ZONE <<< "$cluster_info"
             if gcloud container clusters get-credentials "$CLUSTER_NAME" --zone "$ZONE" --project "$PROJECT_ID" >/dev/null 2>&1; then
                 if kubectl get namespace hopsworks >/dev/null 2>&1; then
                     echo "Found Hopsworks namespace in cluster $CLUSTER_NAME"
                     if confirm "Would you like to delete Hopsworks resources in cluster $CLUSTER_NAME?"; then
+                        # Deleting the namespace also removes hopsworks-sa and docker-config inside it
                         kubectl delete namespace hopsworks --ignore-not-found=true
-                        kubectl delete serviceaccount -n hopsworks hopsworks-sa --ignore-not-found=true
-                        kubectl delete configmap -n hopsworks docker-config --ignore-not-found=true
                     fi
                 fi
             fi
@@ -131,7 +150,7 @@ fi
 
 # Check IAM service accounts
 echo -e "\n${YELLOW}Checking IAM service accounts...${NC}"
-SERVICE_ACCOUNTS=$(gcloud iam service-accounts list --project "$PROJECT_ID" --format="table(email)" | grep "hopsworksai-instances")
+SERVICE_ACCOUNTS=$(gcloud iam service-accounts list --project "$PROJECT_ID" --format="value(email)" | grep "hopsworksai-instances")
 if resource_exists "$SERVICE_ACCOUNTS"; then
     echo -e "Found service accounts:\n$SERVICE_ACCOUNTS"
     if confirm "Would you like to delete these service accounts?"; then
@@ -150,7 +169,7 @@ fi
 
 # Check custom IAM roles
 echo -e "\n${YELLOW}Checking custom IAM roles...${NC}"
-CUSTOM_ROLES=$(gcloud iam roles list --project "$PROJECT_ID" --format="table(name)" | grep "hopsworksai.instances")
+CUSTOM_ROLES=$(gcloud iam roles list --project "$PROJECT_ID" --format="value(name)" | grep "hopsworksai.instances")
 if resource_exists "$CUSTOM_ROLES"; then
     echo -e "Found custom roles:\n$CUSTOM_ROLES"
     if confirm "Would you like to delete these custom roles?"; then
@@ -170,16 +189,21 @@ fi
 
 # Check firewall rules
 echo -e "\n${YELLOW}Checking firewall rules...${NC}"
-FIREWALL_RULES=$(gcloud compute firewall-rules list --project "$PROJECT_ID" --format="table(name)" | grep "gke-")
+FIREWALL_RULES=$(gcloud compute firewall-rules list --project "$PROJECT_ID" --format="value(name)" | grep "gke-")
 if resource_exists "$FIREWALL_RULES"; then
     echo -e "Found firewall rules:\n$FIREWALL_RULES"
     if confirm "Would you like to delete these GKE-related firewall rules?"; then
+        RULE_NAMES=()
         while IFS= read -r rule; do
-            if [ -n "$rule" ] && [[ ! "$rule" =~ "NAME" ]]; then
-                echo "Deleting firewall rule: $rule"
-                gcloud compute firewall-rules delete "$rule" --project "$PROJECT_ID" --quiet
+            if [ -n "$rule" ]; then
+                RULE_NAMES+=("$rule")
             fi
         done <<< "$FIREWALL_RULES"
+        # One call for all rules; gcloud issues the deletions together
+        if [ ${#RULE_NAMES[@]} -gt 0 ]; then
+            echo "Deleting firewall rules: ${RULE_NAMES[*]}"
+            gcloud compute firewall-rules delete "${RULE_NAMES[@]}" --project "$PROJECT_ID" --quiet
+        fi
     fi
 else
     echo "No GKE-related firewall rules found."
@@ -187,21 +211,25 @@ fi
 
 # Check load balancers and target pools
 echo -e "\n${YELLOW}Checking load balancers and target pools...${NC}"
-FORWARDING_RULES=$(gcloud compute forwarding-rules list --project "$PROJECT_ID" --format="table(name,region)" | grep "a[0-9a-f]\{12\}")
+FORWARDING_RULES=$(gcloud compute forwarding-rules list --project "$PROJECT_ID" --format="value(name,region.basename())" | grep "a[0-9a-f]\{12\}")
 if resource_exists "$FORWARDING_RULES"; then
     echo -e "Found load balancers:\n$FORWARDING_RULES"
     if confirm "Would you like to delete these load balancers?"; then
-        while IFS= read -r lb_info; do
-            if [ -n "$lb_info" ] && [[ ! "$lb_info" =~ "NAME" ]]; then
-                LB_NAME=$(echo "$lb_info" | awk '{print $1}')
-                REGION=$(echo "$lb_info" | awk '{print $2}')
-                echo "Deleting load balancer: $LB_NAME in region $REGION"
-                gcloud compute forwarding-rules delete "$LB_NAME" \
-                    --region "$REGION" \
-                    --project "$PROJECT_ID" \
-                    --quiet
+        # Sorted by region, so each run of rules in the same region is deleted with one call
+        LB_NAMES=()
+        CURRENT_REGION=""
+        while read -r LB_NAME REGION; do
+            if [ -z "$LB_NAME" ]; then
+                continue
+            fi
+            if [ "$REGION" != "$CURRENT_REGION" ]; then
+                delete_forwarding_rules "$CURRENT_REGION" "${LB_NAMES[@]}"
+                LB_NAMES=()
+                CURRENT_REGION="$REGION"
             fi
-        done <<< "$FORWARDING_RULES"
+            LB_NAMES+=("$LB_NAME")
+        done < <(sort -k2,2 <<< "$FORWARDING_RULES")
+        delete_forwarding_rules "$CURRENT_REGION" "${LB_NAMES[@]}"
     fi
 else
     echo "No matching load balancers found."